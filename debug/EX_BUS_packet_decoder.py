@@ -4,6 +4,11 @@ import struct
 from binascii import hexlify
 
 from EX_packet_decoder import ExPacketDecoder
+from crc16_ccitt import crc16
+
+
+# channel values are transmitted in steps of 1/8000 ms
+_CHANNEL_SCALE = 1.0 / 8000
 
 
 class ExBusPacketDecoder:
@@ -16,18 +21,19 @@ class ExBusPacketDecoder:
 
     # Packet Identifier
         self.packet_header = {
-            b'\x3E': "Master Packet",
-            b'\x3D': "Master Packet",
-            b'\x3B': "Slave Packet"
+            0x3E: "Master Packet",
+            0x3D: "Master Packet",
+            0x3B: "Slave Packet"
         }
 
         # Data Identifier
+        # key is (packet header << 8) | data identifier
         self.data_identifiers = {
-            (b'\x3E', b'\x31'): "Channel Values",
-            (b'\x3D', b'\x3A'): "Telemetry request",
-            (b'\x3D', b'\x3B'): "JETIBOX request",
-            (b'\x3B', b'\x3A'): "EX Telemetry",
-            (b'\x3B', b'\x3B'): "JETIBOX menu"
+            0x3E31: "Channel Values",
+            0x3D3A: "Telemetry request",
+            0x3D3B: "JETIBOX request",
+            0x3B3A: "EX Telemetry",
+            0x3B3B: "JETIBOX menu"
         }
 
     def decode(self):
@@ -36,78 +42,67 @@ class ExBusPacketDecoder:
         ex_types = {0: 'TEXT', 1: 'DATA', 2: 'MESSAGE'}
 
         # unpack the packet
-        self.header = hexlify(self.packet[0:1])
-        self.source = self.packet_header[bytes(self.packet[0:1])]
-        self.message_length = struct.unpack('b', self.packet[2:3])[0]
-        self.packet_id = struct.unpack('b', self.packet[3:4])[0]
-        self.data_identifier = bytes(self.packet[4:5])
-        self.type = self.data_identifiers[(bytes(self.packet[0:1]), self.data_identifier)]
-        self.length_data = struct.unpack('b', self.packet[5:6])[0]
+        # single bytes are read by indexing (returns an unsigned integer)
+        # slices are taken from a memoryview (no copies of the packet);
+        # the packet must not be modified while the decoded data is in use
+        packet = memoryview(self.packet)
+        self.header = hexlify(packet[0:1])
+        self.source = self.packet_header[packet[0]]
+        self.message_length = packet[2]
+        self.packet_id = packet[3]
+        self.data_identifier = packet[4]
+        self.type = self.data_identifiers[(packet[0] << 8) | self.data_identifier]
+        self.length_data = packet[5]
         self.ex_type = None
         if self.type == 'EX Telemetry':
-            self.ex_id_len = struct.unpack('b', self.packet[7:8])[0]
+            self.ex_id_len = packet[7]
             self.ex_type = ex_types[self.ex_id_len >> 6]
             self.ex_length = self.ex_id_len & 0b00111111
-            self.ex_decoder.ex_packet = self.packet[7:-2]
+            self.ex_decoder.ex_packet = packet[7:-2]
             self.ex_decoder.decode()
-        self.data = self.packet[6:-2]
+        self.data = packet[6:-2]
 
         # reverse the CRC bytes as it comes with LSB first
-        self.crc = int.from_bytes(self.packet[-2:], 'little')
+        self.crc = int.from_bytes(packet[-2:], 'little')
 
     def getChannelData(self):
 
-        self.channel = dict()
-        for i in range(0, self.length_data, 2):
-            channel = self.data[i:i+1] + self.data[i+1:i+2]
-            self.channel[i/2] = int.from_bytes(channel, 'little') / 8000
+        # all channels are unsigned 16 bit values (little endian)
+        # unpack them in one call and scale to milliseconds
+        num_channels = self.length_data // 2
+        values = struct.unpack_from('<%dH' % num_channels, self.data, 0)
+        self.channel = tuple(value * _CHANNEL_SCALE for value in values)
+
+    def packet_crc16(self):
+        '''CRC16 of the packet (without the last 2 CRC bytes).'''
+        return crc16(self.packet, 0, len(self.packet) - 2)
 
     def _print(self):
         '''Print the decoded packet'''
 
-        print('')
-        print('EX BUS Packet:')
-        print('  Header (source): {}'.format(self.source))
-        print('  Message length: {}'.format(self.message_length))
-        print('  Packet ID: {}'.format(self.packet_id))
-        print('  Data identifier: {}'.format(self.type))
-        print('  Length of data blocks: {}'.format(self.length_data))
+        # collect all lines and print them at once
+        lines = ['', 'EX BUS Packet:']
+        lines.append('  Header (source): %s' % self.source)
+        lines.append('  Message length: %d' % self.message_length)
+        lines.append('  Packet ID: %d' % self.packet_id)
+        lines.append('  Data identifier: %s' % self.type)
+        lines.append('  Length of data blocks: %d' % self.length_data)
         if self.ex_type:
-            print('  EX type: {}'.format(self.ex_type))
-            print('  EX length: {}'.format(self.ex_length))
+            lines.append('  EX type: %s' % self.ex_type)
+            lines.append('  EX length: %d' % self.ex_length)
 
         # check for channel data
         if self.type == 'Channel Values':
             self.getChannelData()
-            print('  Channel Values:')
-            for i in range(len(self.channel)):
-                print('    Channel {}: {}'.format(i+1, self.channel[i]))
-
-        print('  CRC16: {}'.format(self.crc16_ccitt(self.packet[:-2])))
-        print('  CRC16 expected: {}'.format(hex(self.crc).upper()[2:]))
-
-    def crc16_ccitt(self, data : bytearray):
-        '''Calculate the CRC16-CCITT value from data packet.
-        Args:
-            data (bytearray): Jeti EX bus packet
-        Returns:
-            int: CRC16-CCITT value
+            lines.append('  Channel Values:')
+            for i, value in enumerate(self.channel):
+                lines.append('    Channel %d: %s' % (i+1, value))
 
-        NOTE: removed offset (see link below) as we start from 1st byte
+        lines.append('  CRC16: %04X' % self.packet_crc16())
+        lines.append('  CRC16 expected: %04X' % self.crc)
 
-        Credits: Mark Adler https://stackoverflow.com/a/67115933/2264936
-        '''
-        crc = 0
-        for i in range(0, len(data)):
-            crc ^= data[i]
-            for j in range(0,8):
-                if (crc & 1) > 0:
-                    crc = (crc >> 1) ^ 0x8408
-                else:
-                    crc = crc >> 1
+        print('\n'.join(lines))
 
-        # return crc
-        return hex(crc).upper()[2:]
 
 
 if __name__ == '__main__':
@@ -130,5 +125,5 @@ if __name__ == '__main__':
         exbus_decoder._print()
         if exbus_decoder.ex_type:
             print('  exbus_decoder.packet: {}'.format(packet))
-            print('  ex_decoder.packet: {}'.format(exbus_decoder.ex_decoder.ex_packet))
+            print('  ex_decoder.packet: {}'.format(bytes(exbus_decoder.ex_decoder.ex_packet)))
             exbus_decoder.ex_decoder._print()
@@ -1,9 +1,32 @@
 '''Decode a Jeti EX packet'''
 
-import struct
 from binascii import hexlify
 
 
+def _crc8_table_entry(crc_element):
+    '''CRC8 (polynomial 0x07) of a single byte value.'''
+
+    POLY = 0x07
+
+    crc_u = crc_element
+
+    for i in range(8):
+
+        # C ternery operation --> condition ? value_if_true : value_if_false
+        #  crc_u = (crc_u & 0x80) ? POLY ^ (crc_u << 1) : (crc_u << 1)
+        # Python ternery operation --> a if condition else b
+        crc_u = POLY ^ (crc_u << 1) if (crc_u & 0x80) else (crc_u << 1)
+
+        # mask crc_u to 8 bits
+        crc_u &= 0xFF
+
+    return crc_u
+
+
+# lookup table, one entry per byte value (computed once at import)
+_CRC8_TABLE = bytes(_crc8_table_entry(i) for i in range(256))
+
+
 class ExPacketDecoder:
 
     def __init__(self, ex_packet=None):
@@ -15,81 +38,69 @@ class ExPacketDecoder:
     def decode(self):
         '''Decode a Jeti EX packet'''
 
+        # the packet may be a bytearray or a memoryview (no copies are made)
+        ex_packet = memoryview(self.ex_packet)
+
         # data identifier (two leftmost bits) and length of data blocks (6 rightmost bits)
-        self.id_len = struct.unpack('b', self.ex_packet[0:1])[0]
+        self.id_len = ex_packet[0]
         self.length = self.id_len & 0b00111111
         self.id = self.id_len >> 6
-        self.product_id = self.ex_packet[2:4]
-        self.device_id = self.ex_packet[4:6]
+        self.product_id = ex_packet[2:4]
+        self.device_id = ex_packet[4:6]
         if self.types[self.id] == 'Data':
             self._decode_data()
         elif self.types[self.id] == 'Text':
             self._decode_text()
 
     def _decode_data(self):
-        self.teleid_dtype = struct.unpack('b', self.ex_packet[6:7])[0]
+        self.teleid_dtype = self.ex_packet[6]
         self.teleid = self.teleid_dtype >> 4
         self.dtype = self.teleid_dtype & 0b00001111
         print('    Data type: {}'.format(self.dtype))
 
     def _decode_text(self):
         # telemtry identifier
-        self.teleid = struct.unpack('b', self.ex_packet[6:7])[0]
+        self.teleid = self.ex_packet[6]
 
         # length of description and unit
-        self.len_desc_unit = struct.unpack('b', self.ex_packet[7:8])[0]
+        self.len_desc_unit = self.ex_packet[7]
         self.len_desc = self.len_desc_unit >> 3
         self.len_unit = self.len_desc_unit & 0b00001111
 
         # description
-        self.desc = self.ex_packet[8:8 + self.len_desc].decode('ascii')
+        self.desc = str(self.ex_packet[8:8 + self.len_desc], 'ascii')
 
         # unit
-        self.unit = self.ex_packet[9 + self.len_desc:9 + self.len_desc + self.len_unit].decode('ascii')
+        self.unit = str(self.ex_packet[9 + self.len_desc:9 + self.len_desc + self.len_unit], 'ascii')
 
     def _print(self):
 
-        print('')
-        print('  EX Packet:')
-        print('    Data identifier: {}'.format(self.types[self.id]))
-        print('    Length of data blocks: {}'.format(self.length))
+        lines = ['', '  EX Packet:']
+        lines.append('    Data identifier: %s' % self.types[self.id])
+        lines.append('    Length of data blocks: %d' % self.length)
         # product id (bytes are little endian) as integer
-        print('    Product ID: {}'.format(int.from_bytes(self.product_id, 'little')))
+        lines.append('    Product ID: %d' % int.from_bytes(self.product_id, 'little'))
         # device id (bytes are little endian) as integer
-        print('    Device ID: {}'.format(int.from_bytes(self.device_id, 'little')))
-        print('    Telemetry identifier: {}'.format(self.teleid))
-        print('    Description: {}'.format(self.desc))
-        print('    Unit: {}'.format(self.unit))
-        print('    CRC8: {}'.format(self.crc8(self.ex_packet[:-1])))
-        print('    CRC8 expected: {}'.format(hex(self.ex_packet[-1])[2:].upper()))
-
-    def update_crc(self, crc_element, crc_seed):
-
-        POLY = 0x07
-
-        crc_u = crc_element
-        crc_u ^= crc_seed
-
-        for i in range(8):
-
-            # C ternery operation --> condition ? value_if_true : value_if_false
-            #  crc_u = (crc_u & 0x80) ? POLY ^ (crc_u << 1) : (crc_u << 1)
-            # Python ternery operation --> a if condition else b
-            crc_u = POLY ^ (crc_u << 1) if (crc_u & 0x80) else (crc_u << 1)
-
-            # mask crc_u to 8 bits
-            crc_u &= 0xFF
+        lines.append('    Device ID: %d' % int.from_bytes(self.device_id, 'little'))
+        lines.append('    Telemetry identifier: %d' % self.teleid)
+        # description and unit only exist in text packets
+        if self.types[self.id] == 'Text':
+            lines.append('    Description: %s' % self.desc)
+            lines.append('    Unit: %s' % self.unit)
+        lines.append('    CRC8: %02X' % self.crc8(self.ex_packet[:-1]))
+        lines.append('    CRC8 expected: %02X' % self.ex_packet[-1])
 
-        return crc_u
+        print('\n'.join(lines))
 
     def crc8(self, ex_packet):
+        '''CRC8 (polynomial 0x07) using one table lookup per byte.'''
 
         crc_up = 0
 
-        for i in range(0, len(ex_packet)):
-            crc_up = self.update_crc(ex_packet[i], crc_up)
+        for b in ex_packet:
+            crc_up = _CRC8_TABLE[crc_up ^ b]
 
-        return hex(crc_up)[-2:].upper()
+        return crc_up
 
 
 if __name__ == '__main__':
@@ -3,31 +3,40 @@ import struct
 from binascii import hexlify
 
 
-def EncodeValue(value, dataType, precision):
-    '''Encode telemetry value.'''
+# format for pack
+_FMT = {0: '<B', 1: '<H', 4: '<I', 5: '<I', 8: '<L', 9: '<L'}
 
-    # format for pack
-    fmt = {0: '<B', 1: '<H', 4: '<I', 5: '<I', 8: '<L', 9: '<L'}
+# number of bytes needed to encode the value (indexed by data type)
+_NUM_BYTES = (1, 2, None, None, 3, 3, None, None, 4, 4)
 
-    # number of bytes needed to encode the value
-    bytes_for_datatype = {0: 1, 1: 2, 4: 3, 5: 3, 8: 4, 9: 4}
+# scaling factors (indexed by precision)
+_POW10 = (1, 10, 100, 1000, 10000, 100000)
+
+# sign and precision bits of the encoded value, key is (dataType, precision, sign)
+_HDR = {(dataType, precision, sign): ((sign << (_NUM_BYTES[dataType] * 8 - 1)) |
+                                      (precision << (_NUM_BYTES[dataType] * 8 - 3)))
+        for dataType in (0, 1, 4, 5, 8, 9)
+        for precision in range(len(_POW10))
+        for sign in (0, 1)}
+
+
+def EncodeValue(value, dataType, precision):
+    '''Encode telemetry value.'''
 
     # get the bit for the sign
-    sign = 0x01 if value < 0 else 0x00
+    sign = int(value < 0)
 
     # number of bytes needed to encode the value
-    num_bytes = bytes_for_datatype[dataType]
+    num_bytes = _NUM_BYTES[dataType]
 
     # scale value based on precision and round it
-    value_scaled = int(abs(value) * 10**precision + 0.5)
+    value_scaled = int(abs(value) * _POW10[precision] + 0.5)
 
-    # combine sign, precision and scaled value
-    value_ex = ((sign << (num_bytes * 8 - 1)) |
-               (precision << (num_bytes * 8 - 3)) |
-                value_scaled)
+    # combine sign, precision (precomputed bits) and scaled value
+    value_ex = _HDR[(dataType, precision, sign)] | value_scaled
 
     # return the encoded value as bytes in little endian format
-    return struct.pack(fmt[dataType], value_ex), value_ex, sign, precision, value_scaled, num_bytes
+    return struct.pack(_FMT[dataType], value_ex), value_ex, sign, precision, value_scaled, num_bytes
 
 if __name__ == '__main__':
 
@@ -0,0 +1,41 @@
+'''CRC16-CCITT of a Jeti EX bus packet (host side debug tools)
+
+Same checksum as src/Jeti/CRC16.py, but in plain Python so that the
+debug tools can run on a PC.
+
+Description of the corresponding C code used by Jeti:
+EX_Bus_protokol_v121_EN.pdf
+
+Credits: Mark Adler https://stackoverflow.com/a/67115933/2264936
+'''
+
+from binascii import crc_hqx
+
+
+# bit reversed byte values (for bytes.translate)
+_REVERSE8 = bytes(int('{:08b}'.format(i)[::-1], 2) for i in range(256))
+
+
+def crc16(data, offset, length):
+    '''Calculate the CRC16-CCITT value from data packet.
+    Args:
+        data (bytearray): Jeti EX bus packet
+        offset (int): index of the first byte to check
+        length (int): number of bytes to check
+    Returns:
+        int: CRC16-CCITT value
+    '''
+    # binascii.crc_hqx is the same CRC in C, but with the bits in MSB
+    # first order (polynomial 0x1021), so the bits of each input byte
+    # and of the result are reversed
+    crc = crc_hqx(bytes(data[offset:offset + length]).translate(_REVERSE8), 0)
+    return (_REVERSE8[crc & 0xFF] << 8) | _REVERSE8[crc >> 8]
+
+
+if __name__ == '__main__':
+
+    # example receiver (master) sends telemetry request (EX_Bus_protokol_v121_EN.pdf, page 6)
+    packet = b'\x3D\x01\x08\x06\x3A\x00'
+
+    print('CRC16 value: %04X' % crc16(packet, 0, len(packet)))
+    print('Expected result:', '8198')
@@ -4,7 +4,9 @@ Debug the Jeti serial connection
 
 '''
 
+import utime
 from machine import Pin, UART
+from ubinascii import hexlify
 
 from Jeti.Serial_UART import Serial
 from Utils.Logger import Logger
@@ -18,14 +20,25 @@ logger = Logger(prestring='JETI SERIAL')
 s = Serial(port=0)
 serial = s.connect()
 
-# read 1 second of the serial stream to a text file for debugging purposes
+# read up to 1 second (at most 1000 bytes) of the serial stream to a text
+# file for debugging purposes
 DEBUG = True
 if DEBUG:
     logger.log('info', 'DEBUG mode is ON')
     logger.log('info', 'Writing EX_Bus_stream.txt')
+    # fill one buffer with bulk reads instead of reading byte by byte
+    # stop after 1 second, also if no (or not enough) data arrives
+    duration = 1000
+    buf = bytearray(1000)
+    mv = memoryview(buf)
+    idx = 0
+    start = utime.ticks_ms()
+    while idx < len(buf) and utime.ticks_diff(utime.ticks_ms(), start) < duration:
+        if serial.any():
+            idx += serial.readinto(mv[idx:])
+    # only the bytes actually received
     with open('EX_Bus_stream.txt', 'w') as f:
-        for i in range(1000):
-            f.write(str(serial.read(1)))
+        f.write(hexlify(mv[:idx], b':').decode())
     logger.log('info', 'Writing EX_Bus_stream.txt finished')
 else:
     logger.log('info', 'DEBUG mode is OFF')
@@ -11,15 +11,36 @@ import micropython
 
 @micropython.viper
 def crc16_ccitt(packet:ptr8, length: int) -> int:
-    '''Calculate the CRC16-CCITT value from data packet.'''
+    '''Calculate the CRC16-CCITT value from data packet.
+
+    Compiled to native code by the viper emitter. The packet is accessed
+    through a byte pointer, so only the first 'length' bytes are used and
+    callers can pass the complete buffer instead of a slice.
+
+    The 8 bit steps per byte are folded into a few shifts and XORs
+    (same as _crc_ccitt_update in avr-libc), no branches and no table.
+    '''
     crc = 0
     for i in range(length):
-        crc ^= packet[i]
-        for j in range(8):
-            if (crc & 1) > 0:
-                crc = (crc >> 1) ^ 0x8408
-            else:
-                crc = crc >> 1
+        x = (crc ^ packet[i]) & 0xFF
+        x ^= (x << 4) & 0xFF
+        crc = ((x << 8) | (crc >> 8)) ^ (x >> 4) ^ (x << 3)
+
+    return crc
+
+
+@micropython.viper
+def crc16_ccitt_update(crc: int, packet:ptr8, offset: int, length: int) -> int:
+    '''Continue a CRC16-CCITT calculation over part of a data packet.
+
+    Starts from the CRC 'crc' of the bytes before 'offset' and adds
+    'length' bytes starting at 'offset'. With a precomputed CRC of a fixed
+    packet header only the remaining bytes have to be checked.
+    '''
+    for i in range(offset, offset + length):
+        x = (crc ^ packet[i]) & 0xFF
+        x ^= (x << 4) & 0xFF
+        crc = ((x << 8) | (crc >> 8)) ^ (x >> 4) ^ (x << 3)
 
     return crc
 
@@ -32,13 +53,13 @@ if __name__ == '__main__':
     '''
 
     # example receiver (master) sends channel data (EX_Bus_protokol_v121_EN.pdf, page 6)
-    packet = [0x3E, 0x03, 0x28, 0x06, 0x31, 0x20, 0x82, 0x1F, 0x82, 0x1F, 0x82,
-              0x1F, 0x82, 0x1F, 0x82, 0x1F, 0x82, 0x1F, 0x82, 0x1F, 0x82, 0x1F,
-              0x82, 0x1F, 0x82, 0x1F, 0x82, 0x1F, 0x82, 0x1F, 0x82, 0x1F, 0x82,
-              0x1F, 0x82, 0x1F, 0x82, 0x1F]
+    packet = bytes((0x3E, 0x03, 0x28, 0x06, 0x31, 0x20, 0x82, 0x1F, 0x82, 0x1F, 0x82,
+                    0x1F, 0x82, 0x1F, 0x82, 0x1F, 0x82, 0x1F, 0x82, 0x1F, 0x82, 0x1F,
+                    0x82, 0x1F, 0x82, 0x1F, 0x82, 0x1F, 0x82, 0x1F, 0x82, 0x1F, 0x82,
+                    0x1F, 0x82, 0x1F, 0x82, 0x1F))
 
     crc_int = crc16_ccitt(packet, len(packet))
-    crc = hex(crc_int)[2:]
+    crc = '%04X' % crc_int
 
     print('')
     print('Example receiver (master) sends channel data:')
@@ -47,10 +68,10 @@ if __name__ == '__main__':
     print('')
 
     # example receiver (master) sends telemetry request (EX_Bus_protokol_v121_EN.pdf, page 6)
-    packet = [0x3D, 0x01, 0x08, 0x06, 0x3A, 0x00]
+    packet = bytes((0x3D, 0x01, 0x08, 0x06, 0x3A, 0x00))
 
     crc_int = crc16_ccitt(packet, len(packet))
-    crc = hex(crc_int)[2:]
+    crc = '%04X' % crc_int
 
     print('')
     print('Example receiver (master) sends telemetry request:')
@@ -59,12 +80,12 @@ if __name__ == '__main__':
     print('')
 
     # example EX telemetry (EX_Bus_protokol_v121_EN.pdf, page 7)
-    packet = [0x3B, 0x01, 0x20, 0x08, 0x3A, 0x18, 0x9F, 0x56, 0x00, 0xA4, 0x51,
-              0x55, 0xEE, 0x11, 0x30, 0x20, 0x21, 0x00, 0x40, 0x34, 0xA3, 0x28,
-              0x00, 0x41, 0x00, 0x00, 0x51, 0x18, 0x00, 0x09]
+    packet = bytes((0x3B, 0x01, 0x20, 0x08, 0x3A, 0x18, 0x9F, 0x56, 0x00, 0xA4, 0x51,
+                    0x55, 0xEE, 0x11, 0x30, 0x20, 0x21, 0x00, 0x40, 0x34, 0xA3, 0x28,
+                    0x00, 0x41, 0x00, 0x00, 0x51, 0x18, 0x00, 0x09))
 
     crc_int = crc16_ccitt(packet, len(packet))
-    crc = hex(crc_int)[2:]
+    crc = '%04X' % crc_int
 
     print('')
     print('Example sensor (slave) sends telemetry data:')
@@ -72,14 +93,25 @@ if __name__ == '__main__':
     print('Expected result:', 'D691')
     print('')
 
+    # same packet with the CRC of the fixed slave header (0x3B, 0x01) precomputed
+    crc_header = crc16_ccitt(packet, 2)
+    crc_int = crc16_ccitt_update(crc_header, packet, 2, len(packet) - 2)
+    crc = '%04X' % crc_int
+
+    print('')
+    print('Example sensor (slave) sends telemetry data (precomputed header CRC):')
+    print('CRC16 value:', crc)
+    print('Expected result:', 'D691')
+    print('')
+
     # example Jetibox menu (EX_Bus_protokol_v121_EN.pdf, page 7)
-    packet = [0x3B, 0x01, 0x28, 0x88, 0x3B, 0x20, 0x43, 0x65, 0x6E, 0x74, 0x72,
-              0x61, 0x6C, 0x20, 0x42, 0x6F, 0x78, 0x20, 0x31, 0x30, 0x30, 0x3E,
-              0x20, 0x20, 0x20, 0x34, 0x2E, 0x38, 0x56, 0x20, 0x20, 0x31, 0x30,
-              0x34, 0x30, 0x6D, 0x41, 0x68]
+    packet = bytes((0x3B, 0x01, 0x28, 0x88, 0x3B, 0x20, 0x43, 0x65, 0x6E, 0x74, 0x72,
+                    0x61, 0x6C, 0x20, 0x42, 0x6F, 0x78, 0x20, 0x31, 0x30, 0x30, 0x3E,
+                    0x20, 0x20, 0x20, 0x34, 0x2E, 0x38, 0x56, 0x20, 0x20, 0x31, 0x30,
+                    0x34, 0x30, 0x6D, 0x41, 0x68))
 
     crc_int = crc16_ccitt(packet, len(packet))
-    crc = hex(crc_int)[2:]
+    crc = '%04X' % crc_int
 
     print('')
     print('Example sensor (slave) sends Jetibox menu:')
@@ -33,37 +33,56 @@ def update_crc(crc_element, crc_seed):
 
     return crc_u
 
+
+# lookup table, one entry per byte value (computed once at import)
+# update_crc(byte, crc) is the same as _CRC8_TABLE[byte ^ crc]
+_CRC8_TABLE = bytes([update_crc(i, 0) for i in range(256)])
+
+
 def crc8(packet):
-    
+    '''Calculate the CRC8 value from data packet (one table lookup per byte).'''
+
     crc_up = 0
 
-    for i in range(0, len(packet)):
-        crc_up = update_crc(packet[i], crc_up)
-   
+    for b in packet:
+        crc_up = _CRC8_TABLE[crc_up ^ b]
+
     return crc_up
 
+
 @micropython.viper
-def crc8_viper(packet: ptr8, length: int) -> int:
-    '''Calculate the CRC8 value from data packet.'''
+def crc8_viper(packet: ptr8, offset: int, length: int) -> int:
+    '''Calculate the CRC8 value from data packet.
+
+    Compiled to native code by the viper emitter, one table lookup per byte.
+    Checks 'length' bytes starting at 'offset', so the packet does not need
+    to be sliced (copied) by the caller.
+    '''
+
+    table = ptr8(_CRC8_TABLE)
 
     crc_up = 0
-    POLY = 0x07
 
-    for i in range(length):
-        # crc_up = update_crc(packet[i], crc_up)
+    for i in range(offset, offset + length):
+        crc_up = table[crc_up ^ packet[i]]
 
-        crc_u = packet[i]
-        crc_u ^= crc_up
+    return crc_up
 
-        for i in range(8):
-            crc_u = POLY ^ (crc_u << 1) if (crc_u & 0x80) else (crc_u << 1)
 
-            # mask crc_u to 8 bits
-            crc_u &= 0xFF
+@micropython.viper
+def crc8_update(crc: int, packet: ptr8, offset: int, length: int) -> int:
+    '''Continue a CRC8 calculation over part of a data packet.
 
-        crc_up = crc_u
+    Starts from the CRC 'crc' of the bytes before 'offset' and adds
+    'length' bytes starting at 'offset'.
+    '''
 
-    return crc_up
+    table = ptr8(_CRC8_TABLE)
+
+    for i in range(offset, offset + length):
+        crc = table[crc ^ packet[i]]
+
+    return crc
 
 
 if __name__ == '__main__':
@@ -72,25 +91,37 @@ if __name__ == '__main__':
     # Counting of checksum value begins at the third byte of the message (length of data)
 
     # data telemetry example (without separators 0x7E, 0x9F and crc)
-    packet = [0x4C, 0xA1, 0xA8, 0x5D, 0x55, 0x00, 0x11, 0xE8,
-                  0x23, 0x21, 0x1B, 0x00]
+    packet = bytes((0x4C, 0xA1, 0xA8, 0x5D, 0x55, 0x00, 0x11, 0xE8,
+                    0x23, 0x21, 0x1B, 0x00))
     crc = crc8(packet)
 
-    print('Jeti CRC8 value:', crc)
+    print('Jeti CRC8 value:', '%02X' % crc)
     print('Expected result:', 'F4')
     
     # same example as above but as bytearray
     packet = bytearray(b'\x4C\xA1\xA8\x5D\x55\x00\x11\xE8\x23\x21\x1B\x00')
     crc = crc8(packet)
 
-    print('Jeti CRC8 value:', crc)
+    print('Jeti CRC8 value:', '%02X' % crc)
     print('Expected result:', 'F4')
 
     # text telemetry example (without separators 0x7E, 0x9F and crc)
-    packet = [0x0F, 0xA1, 0xA8, 0x5D, 0x55, 0x00, 0x02,
-                  0x2A, 0x54, 0x65, 0x6D, 0x70, 0x2E, 0xB0, 0x43]
+    packet = bytes((0x0F, 0xA1, 0xA8, 0x5D, 0x55, 0x00, 0x02,
+                    0x2A, 0x54, 0x65, 0x6D, 0x70, 0x2E, 0xB0, 0x43))
 
     crc = crc8(packet)
 
-    print('Jeti CRC8 value:', crc)
+    print('Jeti CRC8 value:', '%02X' % crc)
+    print('Expected result:', '28')
+
+    # same example as above but with the viper function
+    crc = crc8_viper(packet, 0, len(packet))
+
+    print('Jeti CRC8 value:', '%02X' % crc)
+    print('Expected result:', '28')
+
+    # same example as above, continued after the first 6 bytes
+    crc = crc8_update(crc8_viper(packet, 0, 6), packet, 6, len(packet) - 6)
+
+    print('Jeti CRC8 value:', '%02X' % crc)
     print('Expected result:', '28')
@@ -18,7 +18,9 @@ Date: 04-2021
 # modules starting with 'u' are Python standard libraries which
 # are stripped down in MicroPython to be efficient on microcontrollers
 
+import gc
 import utime as time
+from utime import ticks_ms, ticks_diff
 import ustruct
 import micropython
 from micropython import const
@@ -26,10 +28,96 @@ from micropython import const
 from Jeti import CRC8
 from Utils.Logger import Logger
 from Utils.round_robin import cycler
-from Utils import status
 from Utils.alpha_beta_filter import AlphaBetaFilter
 
 
+# The value encoders write the value directly into the frame buffer at 'pos'
+# and return the position after the value. The top byte holds the sign and
+# precision bits ('flags' = sign << 7 | precision << 5).
+
+@micropython.viper
+def _encode_int6(buffer, pos: int, value_scaled: int, flags: int) -> int:
+    '''Encode data type 0 (int6_t).'''
+    buf = ptr8(buffer)
+    buf[pos] = (value_scaled & 0x1F) | flags
+    return pos + 1
+
+
+@micropython.viper
+def _encode_int14(buffer, pos: int, value_scaled: int, flags: int) -> int:
+    '''Encode data type 1 (int14_t).'''
+    buf = ptr8(buffer)
+    buf[pos] = value_scaled & 0xFF
+    buf[pos + 1] = ((value_scaled >> 8) & 0x1F) | flags
+    return pos + 2
+
+
+@micropython.viper
+def _encode_int22(buffer, pos: int, value_scaled: int, flags: int) -> int:
+    '''Encode data type 4 (int22_t).'''
+    buf = ptr8(buffer)
+    buf[pos] = value_scaled & 0xFF
+    buf[pos + 1] = (value_scaled >> 8) & 0xFF
+    buf[pos + 2] = ((value_scaled >> 16) & 0x1F) | flags
+    return pos + 3
+
+
+@micropython.viper
+def _encode_int22_time(buffer, pos: int, value_scaled: int, flags: int) -> int:
+    '''Encode data type 5 (int22_t, time and date).'''
+    buf = ptr8(buffer)
+    buf[pos] = value_scaled & 0xFF
+    buf[pos + 1] = (value_scaled >> 8) & 0xFF
+    buf[pos + 2] = ((value_scaled >> 16) & 0xFF) | (flags & 0x80)
+    return pos + 3
+
+
+@micropython.viper
+def _encode_int30(buffer, pos: int, value_scaled: int, flags: int) -> int:
+    '''Encode data type 8 (int30_t).'''
+    buf = ptr8(buffer)
+    buf[pos] = value_scaled & 0xFF
+    buf[pos + 1] = (value_scaled >> 8) & 0xFF
+    buf[pos + 2] = (value_scaled >> 16) & 0xFF
+    buf[pos + 3] = ((value_scaled >> 24) & 0x1F) | flags
+    return pos + 4
+
+
+@micropython.viper
+def _encode_int30_gps(buffer, pos: int, value_scaled: int, flags: int) -> int:
+    '''Encode data type 9 (int30_t, GPS).'''
+    buf = ptr8(buffer)
+    buf[pos] = value_scaled & 0xFF
+    buf[pos + 1] = (value_scaled >> 8) & 0xFF
+    buf[pos + 2] = (value_scaled >> 16) & 0xFF
+    buf[pos + 3] = (value_scaled >> 24) & 0xFF
+    return pos + 4
+
+
+@micropython.viper
+def _gps_to_ex(value_min: int, longitude: int, negative: int):
+    '''Encode a GPS coordinate given in thousandths of a minute.'''
+    # Decompose the value into degrees and minutes (in 1/1000 minutes)
+    deg16 = value_min // 60000
+    min16 = value_min % 60000
+
+    # Compute the four bytes (minutes, degrees, flags) as one 32 bit value
+    ex_byte = ((deg16 >> 8) & 0x01) | (longitude << 5) | (negative << 6)
+    value_ex = (min16 & 0xFFFF) | ((deg16 & 0xFF) << 16) | (ex_byte << 24)
+
+    return ustruct.pack('<I', value_ex)
+
+
+# empty Jetibox simple text, 8th bit cleared for the separators (begin, end)
+# and set for the 32 space characters
+_SIMPLE_TEXT_BLANK = bytes([0xFE & ~(1 << 7)] + [ord(' ') | (1 << 7)] * 32 +
+                           [0xFF & ~(1 << 7)])
+
+# value encoders indexed by the EX data type (see Ex.EncodeValue)
+_ENCODERS = (_encode_int6, _encode_int14, None, None, _encode_int22,
+             _encode_int22_time, None, None, _encode_int30, _encode_int30_gps)
+
+
 class Ex:
     '''Jeti EX protocol handler. 
     '''
@@ -39,6 +127,11 @@ class Ex:
         # list of sensors
         self.sensors = sensors
 
+        # sensor meta data and serial number (product and device id),
+        # bound once to skip the attribute lookups on every frame
+        self.meta = sensors.meta
+        self.serial_number = sensors.productID + sensors.deviceID
+
         # lock object used to prevent other cores from accessing shared resources
         self.lock = lock
 
@@ -60,6 +153,46 @@ class Ex:
                                             initial_value=0,
                                             initial_velocity=0,
                                             delta_t=1)
+        # bound once, the filter is updated for every pressure sample
+        self.vario_filter_update = self.vario_filter.update
+
+        # telemetry meta data needed for every data frame, as flat tuples
+        # (id and data type byte, data type, precision, scaling factor)
+        # per telemetry value
+        self.data_meta = dict()
+        for telemetry, meta_tele in sensors.meta.items():
+            id_type = meta_tele['id'] << const(4) | meta_tele['data_type']
+            self.data_meta[telemetry] = (id_type,
+                                         meta_tele['data_type'],
+                                         meta_tele['precision'],
+                                         10**meta_tele['precision'])
+
+        # crc8 of the EX header bytes which are checked (type/length byte,
+        # serial number, reserved byte) for all 256 type/length values
+        # only the type/length byte changes between frames
+        header = bytearray(b'\x00' + self.serial_number + b'\x00')
+        header_crc8 = bytearray(256)
+        for type_length in range(256):
+            header[0] = type_length
+            header_crc8[type_length] = CRC8.crc8(header)
+        self.header_crc8 = bytes(header_crc8)
+
+        # scratch buffer for compiling the EX BUS frame (allocated once)
+        # the EX BUS header starts at byte 0, the EX packet at byte 6 and the
+        # EX data/text at byte 13; finished frames are copied out as bytes
+        self.buffer = bytearray(const(64))
+
+        # static part of the EX bus header (the lengths are set per frame)
+        #   0x3B, 0x01 : EX bus header
+        #   0x00       : dummy id; will be replaced by packet id later
+        #   0x3A       : telemetry identifier
+        ustruct.pack_into('BBBBBB', self.buffer, 0, 0x3B, 0x01, 0x00, 0x00,
+                          0x3A, 0x00)
+
+        # static part of the EX header: packet identifier, serial number
+        # and reserved byte (the type/length byte is set by Header)
+        ustruct.pack_into('BB4sB', self.buffer, const(6), 0x0F, 0x00,
+                          self.serial_number, 0x00)
 
         # initialize the EX BUS packet 
         # needed for check in ExBus.py, set to 'True' in main.py
@@ -92,61 +225,93 @@ class Ex:
         # insert 'DEVICE' as first label
         labels.insert(0, 'DEVICE')
 
-        self.lock.acquire()
-        self.dev_labels_units = list()
+        # frames for device, labels and units
+        # the frames never change, each label is compiled only once (sensors
+        # of the same category share labels) and the result is immutable
+        label_frames = dict()
         for label in labels:
-            # frames for device, labels and units
-            self.dev_labels_units.append(self.exbus_frame(frametype=0, label=label))
+            if label not in label_frames:
+                label_frames[label] = self.exbus_frame(frametype=0, label=label)
+
+        self.lock.acquire()
+        self.dev_labels_units = tuple(label_frames[label] for label in labels)
         self.n_labels = len(labels)
         self.exbus_device_ready = True
         self.lock.release()
 
+        # bind methods used in the loop to locals (saves attribute lookups)
+        lock_acquire = self.lock.acquire
+        lock_release = self.lock.release
+        exbus_frame = self.exbus_frame
+
+        # telemetry data of a sensor depending on its category
+        # (VOLTAGE, CURRENT and CAPACITY are not supported yet)
+        handlers = {'PRESSURE': self.pressure_data,
+                    'RPM': self.rpm_data,
+                    'GPS': self.gps_data}
+
+        # free the temporary objects of the setup before entering the loop
+        # (the loop only allocates the published frames, the frame buffer
+        # is reused), so the heap starts unfragmented
+        gc.collect()
+
         # acquire sensor data and prepare EX BUS telemetry
         while True:
 
             # cycle infinitely through all sensors
             current_sensor = next(cycle_sensors)
-            category = current_sensor.category # cache variable
 
             # collect data from currently selected sensor
             current_sensor.read_jeti()
 
             # update data frame (new sensor data)
-            if category == 'PRESSURE':
-                pressure = current_sensor.pressure / 100.0 # convert to hPa (mbar)
-                temperature = current_sensor.temperature
-                relative_altitude = current_sensor.relative_altitude
-                # variometer
-                climb, altitude = self.variometer(relative_altitude,
-                                                  filter='alpha_beta')
-                self.max_altitude = max(self.max_altitude, altitude)
-                self.max_climb = max(self.max_climb, climb)
-                
-                data = {'PRESSURE': pressure,              # 3 bytes
-                        'TEMPERATURE': temperature,        # 2 bytes
-                        'CLIMB': climb,                    # 2 bytes
-                        'MAX_CLIMB': self.max_climb,       # 2 bytes
-                        'ALTITUDE': altitude,              # 2 bytes
-                        'MAX_ALTITUDE': self.max_altitude} # 2 bytes
-            elif category == 'VOLTAGE':
-                pass
-            elif category == 'CURRENT':
-                pass
-            elif category == 'CAPACITY':
-                pass
-            elif category == 'RPM':
-                rpm = current_sensor.rpm
-                data = {'RPM': rpm}
-            elif category == 'GPS':
-                data = {'GPSLAT',
-                                self.GPStoEX(current_sensor.longitude, longitude=True),
-                                'GPSLON', 
-                                self.GPStoEX(current_sensor.latitude, longitude=False)}
-
-            self.lock.acquire()
-            self.exbus_data = self.exbus_frame(frametype=const(1), data=data) # data
+            handler = handlers.get(current_sensor.category)
+            if handler is None:
+                # category without telemetry data (yet)
+                continue
+            data = handler(current_sensor)
+
+            # compile the frame without holding the lock (the buffer is only
+            # used on this core and the frame is a new immutable object),
+            # only publishing the new frame needs the lock
+            frame = exbus_frame(frametype=const(1), data=data) # data
+
+            lock_acquire()
+            self.exbus_data = frame
             self.exbus_data_ready = True
-            self.lock.release()
+            lock_release()
+
+    @micropython.native
+    def pressure_data(self, sensor):
+        '''Telemetry data of a pressure sensor (including the variometer).'''
+        pressure = sensor.pressure / 100.0 # convert to hPa (mbar)
+        temperature = sensor.temperature
+        relative_altitude = sensor.relative_altitude
+        # variometer
+        climb, altitude = self.variometer(relative_altitude,
+                                          filter='alpha_beta')
+        self.max_altitude = max(self.max_altitude, altitude)
+        self.max_climb = max(self.max_climb, climb)
+
+        return {'PRESSURE': pressure,              # 3 bytes
+                'TEMPERATURE': temperature,        # 2 bytes
+                'CLIMB': climb,                    # 2 bytes
+                'MAX_CLIMB': self.max_climb,       # 2 bytes
+                'ALTITUDE': altitude,              # 2 bytes
+                'MAX_ALTITUDE': self.max_altitude} # 2 bytes
+
+    @micropython.native
+    def rpm_data(self, sensor):
+        '''Telemetry data of an rpm sensor.'''
+        return {'RPM': sensor.rpm}
+
+    @micropython.native
+    def gps_data(self, sensor):
+        '''Telemetry data of a GPS sensor.'''
+        return {'GPSLAT',
+                self.GPStoEX(sensor.longitude, longitude=True),
+                'GPSLON',
+                self.GPStoEX(sensor.latitude, longitude=False)}
 
     @micropython.native
     def exbus_frame(self, frametype=None, label=None, data=None):
@@ -155,85 +320,74 @@ class Ex:
          is added later in ExBus.py as it needs to include the packet id.
         '''
 
-        # setup ex packet
-        ex_packet, len_ex = self.ex_frame(frametype=frametype,
-                                          data=data,
-                                          label=label)
-
-        # initiliaze the EX BUS packet
-        exbus_packet = bytearray()
-
-        # EX bus header
-        exbus_packet += b'\x3B\x01'
-
-        # EX bus packet length in bytes including the header and CRC
-        exbus_packet += ustruct.pack('B', len_ex + const(8))
-        
-        # put dummy id here; will be replaced by packet id later
-        exbus_packet += b'\x00'
+        # setup ex packet (written to the buffer from byte 6 onwards)
+        len_ex = self.ex_frame(frametype=frametype, data=data, label=label)
 
-        # telemetry identifier
-        exbus_packet += b'\x3A'
-
-        # EX packet length (including 0xF and crc8 bytes)
-        exbus_packet += ustruct.pack('B', len_ex)
-
-        # add EX packet
-        exbus_packet += ex_packet
+        # EX bus header (6 bytes, the constant bytes are written in __init__)
+        #   len_ex + 8 : EX bus packet length in bytes including the header and CRC
+        #   len_ex     : EX packet length (including 0xF and crc8 bytes)
+        buffer = self.buffer
+        buffer[const(2)] = len_ex + const(8)
+        buffer[const(5)] = len_ex
 
         # checksum added later in ExBus.py as it needs to include the packet id
 
         # return as bytes, to stay immutable!!!
         # bytearray caused troubles in ExBus.sendTelemetry
-        return bytes(exbus_packet)
+        # (the buffer is overwritten by the next frame)
+        return bytes(memoryview(buffer)[:len_ex + const(6)])
 
     @micropython.native
     def ex_frame(self, frametype=None, data=None, label=None):
-        '''Compile the EX telemetry packet (Header, data or text, etc.).'''
+        '''Compile the EX telemetry packet (Header, data or text, etc.).
+
+        The packet is written to the buffer starting at byte 6.
+
+        Returns:
+            int: length of the EX packet
+        '''
+
+        buffer = self.buffer
 
         if frametype == const(1): # data
             # put sensor data into ex frame
-            data, length = self.Data(data=data)
+            length = self.Data(data=data)
         elif frametype == const(0): # text
             # put text data into ex frame
-            data, length = self.Text(label=label)
+            length = self.Text(label=label)
         elif frametype == const(2): # message
             # put message data into ex frame
             message = 'Greetings from chiefenne'
-            data, length = self.Message(message=message, msg_class=const(0))
+            length = self.Message(text=message, msg_class=const(0))
 
         # compile header (types are 'text', 'data', 'message')
-        header = self.Header(frametype, length)
-
-        # compile the complete EX packet
-        ex_packet = bytearray()
-        ex_packet += header
-        ex_packet += data
+        type_length = self.Header(frametype, length)
 
         # crc for telemetry (8-bit crc)
         # counting begins at the length byte of a message (skipping the header)
-        crc8_int = CRC8.crc8_viper(ex_packet[1:], len(ex_packet[1:]))
+        # the crc of the header bytes is looked up, only the data is checked
+        crc8_int = CRC8.crc8_update(self.header_crc8[type_length],
+                                    buffer, const(13), length)
 
-        # add crc8 to the packet ('B' is unsigned byte 8-bit)
-        ex_packet += ustruct.pack('B', crc8_int)
+        # add crc8 to the packet (single unsigned byte)
+        buffer[const(13) + length] = crc8_int
 
         # compile simple text for JETI box (34 bytes)
         # message = 'Greetings from chiefenne'
         # ex_packet += self.SimpleText(message)
 
-        return ex_packet, len(ex_packet)
+        return length + const(8)
 
     @micropython.native
     def Header(self, frametype, length):
-        '''EX packet message header.'''
+        '''EX packet message header (7 bytes, written to the buffer at byte 6).
 
-        header = bytearray()
+        Returns:
+            int: combined packet type and length byte
+        '''
 
         # message separator - not needed if EX frame is embedded in EX BUS frame
-        # header += b'\x7E'
-
-        # packet identifier
-        header += b'\x0F'
+        # b'\x7E'
 
         # 2 bits for packet type (0=text, 1=data, 2=message)
         # these are the two leftmost bits of 3rd byte; shift left by 6
@@ -246,84 +400,104 @@ class Ex:
 
         # combine 2+6 bits (3rd byte)
         type_length = telemetry_type | telemetry_length
-        header += ustruct.pack('B', type_length)
-
-        # serial number (bytes 4-5 and 6-7)
-        header += self.sensors.productID
-        header += self.sensors.deviceID
 
-        # reserved (8th byte)
-        header += b'\x00'
+        # packet identifier, serial number (bytes 4-5 and 6-7) and reserved
+        # 8th byte are written once in __init__, only type/length changes
+        self.buffer[const(7)] = type_length
 
-        return header
+        return type_length
 
     @micropython.native
     def Data(self, data=None):
-        '''EX data packet. Maximum length including the header and crc8 is 29 bytes.'''
+        '''EX data packet. Maximum length including the header and crc8 is 29 bytes.
 
-        exdata = bytearray()
+        The data is written to the buffer starting at byte 13.
+
+        Returns:
+            int: number of bytes written
+        '''
+
+        buffer = self.buffer
+        pos = const(13)
 
         # speed up obejct access
-        meta = self.sensors.meta
+        data_meta = self.data_meta
+        encode_value = self.EncodeValue
 
         for telemetry, value in data.items():
-            meta_tele = meta[telemetry] # speed up object access
             # compile 9th byte onwards of EX data specification
-            id = meta_tele['id'] << const(4)
-            data_type = meta_tele['data_type']
-            # combine bits for id and data type
-            exdata += ustruct.pack('B', id | data_type)
+            id_type, data_type, precision, scale = data_meta[telemetry]
+            # combined bits for id and data type
+            buffer[pos] = id_type
+            pos += 1
 
             # data of 1st telemetry value, converted to EX format
-            # scale value based on precision and round it
-            mult = -1 if value < 0 else 1
-            value_scaled = int(value * 10**meta_tele['precision'] + mult * 0.5)
-            exdata += self.EncodeValue(value_scaled,
-                                     meta_tele['data_type'],
-                                     meta_tele['precision'])
+            # scale value based on precision (rounded in EncodeValue)
+            # the encoded value is written to the buffer directly
+            pos = encode_value(value * scale, data_type, precision, pos)
 
-        return exdata, len(exdata)
+        return pos - const(13)
 
     @micropython.native
     def Text(self, label=None):
         '''EX text packet. This transfers the sensor description and unit for
         one sensor value.
         Maximum length including the header and crc8 is 29 bytes.
+
+        The text is written to the buffer starting at byte 13.
+
+        Returns:
+            int: number of bytes written
         '''
 
         # cache object
-        meta_label = self.sensors.meta[label]
+        meta_label = self.meta[label]
         id = meta_label['id']
-        description = meta_label['description']
-        unit = meta_label['unit']
+        # description and unit as bytes (one conversion each)
+        description = meta_label['description'].encode('ascii')
+        unit = meta_label['unit'].encode('ascii')
 
-        # initiliaze the EX BUS packet
-        extext = bytearray()
+        buffer = self.buffer
+        len_description = len(description)
+        len_unit = len(unit)
 
         # compile 9th byte of EX text specification (1 byte)
-        extext += ustruct.pack('B', id)
+        buffer[const(13)] = id
 
         # compile 10th byte of EX text specification (5bits + 3bits)
-        extext += ustruct.pack('B', len(description) << 3 | len(unit))
+        buffer[const(14)] = len_description << 3 | len_unit
 
         # compile 11th+x bytes of EX text specification
-        extext += bytes([ord(c) for c in description])
+        pos = const(15)
+        buffer[pos:pos + len_description] = description
 
         # compile 11+x+y bytes of EX text specification (y bytes)
-        extext += bytes([ord(c) for c in unit])
+        pos += len_description
+        buffer[pos:pos + len_unit] = unit
 
-        return extext, len(extext)
+        return const(2) + len_description + len_unit
 
     @micropython.native
-    def Message(self, message=None, msg_class=const(0)):
+    def Message(self, text=None, msg_class=const(0)):
         '''This message type allows transmitting any textual information directly
         to the pilot. Additional semantics can be added to the message
-        (alarm/status/warning).'''
+        (alarm/status/warning).
+
+        The message is written to the buffer starting at byte 13.
+
+        Returns:
+            int: number of bytes written
+        '''
+
+        buffer = self.buffer
+
+        # message text as bytes (one conversion)
+        body = bytes(text, 'ascii')
+        len_body = len(body)
 
-        message = bytearray()
         # compile 9th byte of EX message specification (1 byte)
         # identifyer of message type (0-255)
-        message += ustruct.pack('B', 0)
+        buffer[const(13)] = 0
 
         # compile 10th byte of EX message specification (3bits + 5bits)
         # message class (0-4)
@@ -332,26 +506,21 @@ class Ex:
         # 2: Warning (alarm, high vibrations, preflight conditions check, …)
         # 3: Recoverable error (loss of GPS position, erratic sensor data, …)
         # 4: Nonrecoverable error (peripheral failure, unexpected hardware fault, …)
-        message += ustruct.pack('B', msg_class << const(5) | len(message))
+        buffer[const(14)] = msg_class << const(5) | len_body
 
         # compile 11th+x bytes of EX message specification
-        message += bytes([ord(c) for c in message])
+        buffer[const(15):const(15) + len_body] = body
 
-        return message, len(message)
+        return const(2) + len_body
 
     @micropython.native
     def Alarm(self, tone=False, code=None):
         '''EX packet alarm.'''
-        alarm = bytearray()
-
         # number of bytes following (always 2)
-        alarm += b'\x02'
-
         # 0x22 (without reminder tone, e.g. vario) or 0x23 (with reminder tone, e.g. low battery)
-        alarm += b'\x23' if tone else b'\x22'
-
         # ASCII letter ('A' to 'Z') to be signalized by Morse alarm
-        alarm += bytes([ord(code)])
+        # (all three bytes in one allocation)
+        alarm = bytearray((0x02, 0x23 if tone else 0x22, ord(code)))
 
         return alarm, len(alarm)
 
@@ -361,12 +530,12 @@ class Ex:
 
         # calculate delta's for gradient
         # use ticks_diff to produce correct result (when timer overflows)
-        vario_time = time.ticks_ms()
-        dt = time.ticks_diff(vario_time, self.vario_time_old) / 1000.0
+        vario_time = ticks_ms()
+        dt_ms = ticks_diff(vario_time, self.vario_time_old)
         dz = altitude - self.last_altitude
 
-        # calculate the climbrate
-        climbrate_raw = dz / (dt + 1.e-9)
+        # calculate the climbrate (time difference in ms, one division)
+        climbrate_raw = dz * 1000.0 / (dt_ms + 1.e-6)
 
         if filter == 'exponential':
             # smoothing filter for the climb rate
@@ -374,7 +543,7 @@ class Ex:
                 self.vario_smoothing * (self.last_climbrate - climbrate_raw)
         elif filter == 'alpha_beta':
             # alpha-beta filter for the climb rate
-            climbrate = self.vario_filter.update(climbrate_raw)
+            climbrate = self.vario_filter_update(climbrate_raw)
         else:
             climbrate = climbrate_raw
 
@@ -398,30 +567,29 @@ class Ex:
 
         # crop text if too long, fill up if needed, left adjusted
         # 32 bytes are reserved for the text
-        text = '{:<32}'.format(text[:32])
-
-        simple_text = bytearray()
-
-        # separator of message (begin), clear 8th bit
-        simple_text += (0xFE & ~(1 << 7)).to_bytes(1, 'little')
+        text = text.encode('ascii')
+        len_text = min(len(text), const(32))
 
-        # add the text to the packet, set 8th bit
-        for c in text:
-            simple_text += bytes([ord(c) | (1 << 7)])
+        # start from an empty simple text (separators and 32 spaces)
+        simple_text = bytearray(_SIMPLE_TEXT_BLANK)
 
-        # separator of message (end), clear 8th bit
-        simple_text += (0xFF & ~(1 << 7)).to_bytes(1, 'little')
+        # add the text to the packet, set 8th bit (no slices or padded copy)
+        for i in range(len_text):
+            simple_text[i + 1] = text[i] | (1 << 7)
 
         return simple_text
 
-    @micropython.viper
-    def EncodeValue(self, value_scaled: int, dataType: int, precision: int):
-        '''Encode telemetry value.
+    @micropython.native
+    def EncodeValue(self, value, dataType, precision, pos):
+        '''Encode telemetry value and write it to the frame buffer.
+
+        Args:
+            value : telemetry value already scaled by 10**precision
+            pos : position of the value in the frame buffer
 
         Returns:
-            value_ex : encoded value as bytes in little endian format
-        
-            
+            pos : position after the encoded value (little endian format)
+
         Data type | Description |  Note
         ----------|-------------|---------------------------------------
             0     |   int6_t    |  Data type  6b (-31 ,31)
@@ -433,61 +601,29 @@ class Ex:
 
         '''
 
+        # round half away from zero (int() truncates towards zero)
+        # the offset is +0.5 or -0.5 depending on the sign (no branch)
+        value_scaled = int(value + (0.5 - (value < 0)))
+
         # zero must be positive, otherwise wrong value is encoded
-        sign = 0x01 if value_scaled < 0 else 0x00
+        # sign and precision bits of the top byte
+        flags = (value_scaled < 0) << 7 | precision << 5
 
         # combine sign, precision and scaled value
-        if dataType == 0: # int6_t
-            lo_byte = (value_scaled & 0x1F) | sign << 7 | (precision << 5)
-            value_ex = ustruct.pack('b', lo_byte)
-        elif dataType == 1: # int14_t
-            lo_byte = value_scaled & 0xFF
-            hi_byte = ((value_scaled >> 8) & 0x1F) | (sign << 7) | (precision << 5)
-            value_ex = ustruct.pack('bb', lo_byte, hi_byte)
-        elif dataType == 4: # int22_t
-            lo_byte = value_scaled & 0xFF
-            mid_byte = ((value_scaled >> 8) & 0xFF)
-            hi_byte = ((value_scaled >> 16) & 0x1F) | (sign << 7) | (precision << 5)
-            value_ex = ustruct.pack('bbb', lo_byte, mid_byte, hi_byte)
-        elif dataType == 5: # int22_t, time and date
-            lo_byte = value_scaled & 0xFF
-            mid_byte = ((value_scaled >> 8) & 0xFF)
-            hi_byte = ((value_scaled >> 16) & 0xFF) | (sign << 7)
-            value_ex = ustruct.pack('bbb', lo_byte, mid_byte, hi_byte)
-        elif dataType == 8: # int30_t
-            lo_byte = value_scaled & 0xFF
-            mid_byte = ((value_scaled >> 8) & 0xFF)
-            hi_byte = ((value_scaled >> 16) & 0xFF)
-            ex_byte = ((value_scaled >> 24) & 0x1F) | (sign << 7) | (precision << 5)
-            value_ex = ustruct.pack('bbbb', lo_byte, mid_byte, hi_byte, ex_byte)
-        elif dataType == 9: # int30_t, GPS
-            lo_byte = value_scaled & 0xFF
-            mid_byte = ((value_scaled >> 8) & 0xFF)
-            hi_byte = ((value_scaled >> 16) & 0xFF)
-            ex_byte = ((value_scaled >> 24) & 0xFF)
-            value_ex = ustruct.pack('bbbb', lo_byte, mid_byte, hi_byte, ex_byte)
-
-        return value_ex
+        # (one encoder per data type, selected by table lookup)
+        return _ENCODERS[dataType](self.buffer, pos, value_scaled, flags)
 
     @micropython.native
     def GPStoEX(self, value, longitude=True):
         '''Convert GPS coordinates to EX format.
         The GPS coordinates are given in decimal format.
         '''
-        # Decompose the value into degrees and minutes
-        deg, frac = divmod(abs(value), 1)
-        deg16 = int(deg)
-        min16 = int(abs(frac) * 0.6 * 100000)
-
-        # Compute the four bytes
-        lo_byte = min16 & 0xFF
-        mid_byte = (min16 >> 8) & 0xFF
-        hi_byte = deg16 & 0xFF
-        ex_byte = ((deg16 >> 8) & 0x01) | (longitude << 5) | ((value < 0) << 6)
-
-        value_ex = ustruct.pack('bbbb', lo_byte, mid_byte, hi_byte, ex_byte)
+        # single float operation (and single truncation) to 1/1000 minutes,
+        # the rest is integer math in viper
+        # (at most 180 * 60000, exactly representable even as float32)
+        value_min = int(abs(value) * 60000)
 
-        return value_ex
+        return _gps_to_ex(value_min, int(longitude), int(value < 0))
 
     def dummy(self):
         '''Dummy function for checking the lock.
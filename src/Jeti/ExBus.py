@@ -13,8 +13,8 @@ Date: 04-2021
 # modules starting with 'u' are Python standard libraries which
 # are stripped down in MicroPython to be efficient on microcontrollers
 
-from ubinascii import hexlify
 import utime
+import ustruct
 import micropython
 from micropython import const
 
@@ -22,6 +22,10 @@ from Jeti import CRC16
 from Utils.Logger import Logger
 
 
+# CRC16 of the fixed header of a slave packet (see Ex.exbus_frame)
+SLAVE_HEADER_CRC = CRC16.crc16_ccitt(b'\x3B\x01', 2)
+
+
 class ExBus:
     '''Jeti EX-BUS protocol handler.
     '''
@@ -70,13 +74,19 @@ class ExBus:
         # packet end
         STATE_END = const(3)
 
+        # bind methods used in every iteration to locals
+        # (avoids the attribute lookups inside the loop)
+        serial_any = self.serial.any
+        serial_read = self.serial.read
+        checkCRC = self.checkCRC
+
         # initialize the state
         state = STATE_HEADER_1
         while True:
 
             # read one byte from the serial stream
-            if self.serial.any():
-                c = self.serial.read(1)
+            if serial_any():
+                c = serial_read(1)
 
             if state == STATE_HEADER_1:
 
@@ -127,7 +137,7 @@ class ExBus:
                 if len(buffer) == packet_length:
                     
                     # check CRC
-                    if self.checkCRC(buffer): # packet is complete and CRC is correct
+                    if checkCRC(buffer): # packet is complete and CRC is correct
     
                         # check for channel data
                         if buffer[0:1] == b'\x3e' and \
@@ -136,7 +146,7 @@ class ExBus:
 
                         # check for telemetry request
                         elif buffer[:2] == b'\x3d\x01' and buffer[4:5] == b'\x3a':
-                            self.sendTelemetry(buffer[3:4])
+                            self.sendTelemetry(buffer[3])
 
                         # check for JetiBox request
                         elif buffer[:2] == b'\x3d\x01' and buffer[4:5] == b'\x3b':
@@ -148,19 +158,23 @@ class ExBus:
 
     @micropython.native
     def getChannelData(self, buffer):
+        '''Store the channel values of a channel data packet.
+
+        Each channel is an unsigned 16 bit value (little endian) in steps
+        of 1/8000 ms, read directly from the buffer without slicing.
+        '''
         self.channel = dict()
         
-        num_channels = int.from_bytes(buffer[5:6], 'little') // 2
+        num_channels = buffer[5] // 2
 
         for i in range(num_channels):
-            self.channel[i] = buffer[6 + i*2 : 7 + i*2] + \
-                              buffer[7 + i*2 : 8 + i*2]
+            self.channel[i] = ustruct.unpack_from('<H', buffer, 6 + i*2)[0]
 
     @micropython.native
     def sendTelemetry(self, packetID):
         '''Send telemetry data back to the receiver (master).
 
-        The packet ID is required to answer the request with the same ID.
+        The packet ID (int) is required to answer the request with the same ID.
         '''
 
         # frame counter
@@ -186,17 +200,25 @@ class ExBus:
         if self.lock.locked():
             self.lock.release()
 
+        # copy the packet once into a buffer with room for the crc
+        # (no slices of the packet are needed)
+        length = len(telemetry)
+        packet = bytearray(length + 2)
+        packet[:length] = telemetry
+
         # packet ID (answer with same ID as by the request)
-        telemetry_ID = telemetry[:3] + packetID + telemetry[4:]
+        packet[3] = packetID
 
         # calculate the crc for the packet (as the packet is complete now)
-        crc16_int = CRC16.crc16_ccitt(telemetry_ID, len(telemetry_ID))
+        # the crc of the fixed slave header is precomputed
+        crc16_int = CRC16.crc16_ccitt_update(SLAVE_HEADER_CRC, packet,
+                                             2, length - 2)
 
-        # convert crc to bytes with little endian
-        telemetry_ID_CRC16 = telemetry_ID + crc16_int.to_bytes(2, 'little')
+        # add crc (little endian)
+        ustruct.pack_into('<H', packet, length, crc16_int)
 
         # write packet to the EX bus stream
-        bytes_written = self.serial.write(telemetry_ID_CRC16)
+        bytes_written = self.serial.write(packet)
 
         return bytes_written
 
@@ -217,19 +239,16 @@ class ExBus:
         '''
 
         # packet to check is message without last 2 bytes
-        crc_int = CRC16.crc16_ccitt(packet[:-2], len(packet[:-2]))
-        crc = hex(crc_int)[2:]
+        # the viper function reads the buffer directly, so limiting the
+        # length is enough (no slice copy of the packet needed)
+        crc_int = CRC16.crc16_ccitt(packet, len(packet) - 2)
 
         # the last 2 bytes of the message makeup the crc value for the packet
-        crc_check = hexlify(packet[-2:]).decode()
+        # (LSB first), compare as integers instead of hex strings (the hex
+        # string of crc values below 0x1000 had no leading zeros)
+        crc_check = packet[-2] | (packet[-1] << 8)
 
-        # swap bytes in 2 byte crc value (LSB and MSB)
-        crc = crc[2:4] + crc[0:2]
-        
-        if crc == crc_check:
-            return True
-        else:
-            return False
+        return crc_int == crc_check
 
     def dummy(self):
         '''Dummy function for checking lock.
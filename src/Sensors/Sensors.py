@@ -28,6 +28,12 @@ class Sensors:
         with open('Sensors/sensors.json') as f:
             self.sensor_data = json.load(f)
 
+        # known I2C sensors keyed by their integer address (as returned by
+        # I2C.scan), the json keys are hex strings like '0x76'
+        self.i2c_sensor_data = {int(key, 16): data
+                                for key, data in self.sensor_data.items()
+                                if key.startswith('0x')}
+
         # telemetry meta data (16 fields per device including the device name)
         # this means 15 fields are available for sensors
         # a second device can be used for another 15 sensors
@@ -69,20 +75,24 @@ class Sensors:
 
         for address in self.addresses:
 
-            # convert int address to hex (returns a string)
-            addr = hex(address)
+            # look up the sensor definition for the address (from sensors.json)
+            data = self.i2c_sensor_data.get(address)
+            if data is None:
+                message = 'Unknown device at address: {}'.format(hex(address))
+                self.logger.log('warning', message)
+                continue
 
             # import the module for the I2C sensor dynamically from sensors.json
-            sensor_defs = __import__('Sensors/' + self.sensor_data[addr]['module'])
-            sensor_class = getattr(sensor_defs, self.sensor_data[addr]['class'])
+            sensor_defs = __import__('Sensors/' + data['module'])
+            sensor_class = getattr(sensor_defs, data['class'])
             sensor = sensor_class(address=address, i2c=self.i2c)
 
             sensor.address = address
-            sensor.name = self.sensor_data[addr]['name']
-            sensor.manufacturer = self.sensor_data[addr]['manufacturer']
-            sensor.description = self.sensor_data[addr]['description']
-            sensor.category = self.sensor_data[addr]['category']
-            sensor.labels = self.sensor_data[addr]['labels']
+            sensor.name = data['name']
+            sensor.manufacturer = data['manufacturer']
+            sensor.description = data['description']
+            sensor.category = data['category']
+            sensor.labels = data['labels']
 
             self.sensors.append(sensor)
 
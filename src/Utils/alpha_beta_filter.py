@@ -13,6 +13,9 @@ class AlphaBetaFilter:
         self.velocity = initial_velocity
         self.delta_t = delta_t
 
+        # velocity gain, constant for the lifetime of the filter
+        self.beta_dt = beta / delta_t
+
     @micropython.native
     def update(self, measurement):
         
@@ -22,6 +25,6 @@ class AlphaBetaFilter:
         # Update based on measurement
         error = measurement - self.estimate
         self.estimate += self.alpha * error
-        self.velocity += (self.beta / self.delta_t) * error
+        self.velocity += self.beta_dt * error
 
         return self.estimate